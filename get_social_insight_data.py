@@ -2,10 +2,18 @@
 from __future__ import annotations
 
 import argparse
-from datetime import datetime, timedelta
+import atexit
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, ExitStack
+from datetime import date as Date, datetime, timedelta
 import getpass
+from itertools import groupby
+import json
 
 import os
+import queue
+import re
+import signal
 
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
@@ -14,11 +22,27 @@ from selenium.webdriver.safari.service import Service as SafariService
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
+
+try:
+    import keyring
+    from keyring.errors import KeyringError
+except ImportError:
+    keyring = None
 
 import sys
-import time
 
-WAIT_TIME_OF_VIEW = 3
+TIMEOUT_OF_VIEW = 10
+
+# ログイン状態 (cookie) を保存する Chrome のプロファイルディレクトリ
+CHROME_PROFILE_DIR = "driver/chrome-profile"
+
+# 保存した csv の時系列データの行 (Format: YYYY-MM-DDTHH,DATA)
+#   NOTE: DATA が空の行も，欠損を作らないように "" として読み込む
+ROW_PATTERN = re.compile(r'^(20\d{2}-\d{2}-\d{2}T\d{2}),(.*)$')
+
+# パスワードを保存する keyring のサービス名
+KEYRING_SERVICE = "social-insight"
 
 
 def parse_args():
@@ -29,9 +53,10 @@ def parse_args():
     parser = argparse.ArgumentParser(
         description='get the time series of the keyword from Google Trends.')
 
-    parser.add_argument('keyword',
+    parser.add_argument('keywords',
                         type=str,
-                        help='specify the keyword to search for')
+                        nargs='+',
+                        help='specify the keywords to search for')
 
     parser.add_argument('start_date',
                         type=str,
@@ -50,11 +75,84 @@ def parse_args():
         'specify the save directory of downloaded csv files (Default: SI_keyword/csv)'
     )
 
+    parser.add_argument(
+        "-n",
+        "--num_workers",
+        type=int,
+        default=1,
+        help='specify the number of web drivers to download in parallel (Default: 1)'
+    )
+
     args = parser.parse_args()
 
+    if args.num_workers < 1:
+        parser.error('--num_workers must be at least 1')
+
+    if args.save != "" and len(args.keywords) > 1:
+        parser.error('--save cannot be used with multiple keywords')
+
     return args
 
 
+def exit_on_signal(signum, frame):
+    '''
+    シグナルを受けたら SystemExit で終了し，WebDriver の後始末を行わせる
+    '''
+    sys.exit(128 + signum)
+
+
+def wait_for_highcharts(web_driver,
+                        title: str,
+                        timeout: float = TIMEOUT_OF_VIEW) -> str:
+    '''
+    ページ上に title を含む Highcharts のグラフができるまで待ち，その csv を得る
+
+    Parameters
+    -----------
+    web_driver : 待機する WebDriver
+    title (str) : 待つグラフの csv に含まれる文字列 (e.g., "時間帯別")
+    timeout (float) : 待機する最大の秒数 (Default: TIMEOUT_OF_VIEW)
+
+    Returns
+    -----------
+    str : グラフの csv
+        NOTE: timeout 秒以内にグラフができなければ TimeoutException を送出する
+    '''
+    return WebDriverWait(web_driver, timeout).until(
+        lambda d: d.execute_script(
+            """
+            const charts = (window.Highcharts && Highcharts.charts) || [];
+            for (const c of charts) {
+                if (!c || !c.getCSV) continue;
+                const s = c.getCSV();
+                if (s && s.indexOf(arguments[0]) !== -1) return s;
+            }
+            return null;
+            """, title))
+
+
+def xpath_literal(text: str) -> str:
+    '''
+    文字列 text を XPath の文字列リテラルにする
+
+    Parameters
+    -----------
+    text (str) : リテラルにする文字列 (引用符を含んでもよい)
+
+    Returns
+    -----------
+    str : XPath の文字列リテラル
+        NOTE: ' と " の両方を含むときは concat() で連結する
+    '''
+    if "'" not in text:
+        return f"'{text}'"
+    if '"' not in text:
+        return f'"{text}"'
+
+    parts = text.split("'")
+    return "concat(" + ", \"'\", ".join(f"'{part}'" for part in parts) + ")"
+
+
 class SocialInsightData():
     '''
     Social Insight から取得したデータを管理するクラス
@@ -63,51 +161,44 @@ class SocialInsightData():
     -----------
     _keyword (str) : 検索キーワード
     _keyword_id (str) : 検索キーワードの ID
+    _keyword_id_cache_path (str) : 検索キーワードの ID を保存するファイル
     _start_date (str) : データ取得の開始日 (Format: YYYY-MM-DD)
     _end_date (str) :データ取得の終了日 (Format: YYYY-MM-DD)
     
     _save_dir : 取得したデータ(csv)を保存するディレクトリ
+    _url_prefix (str) : データを取得するページの URL の日付より前の部分
+    _save_prefix (str) : 保存するファイルのパスの日付より前の部分
     
     _data (dict[int, dict]) : 各 period の検索スコアの時系列データ
         NOTE: スケーリングとかしないので基本的には 1 つの period になる
+        NOTE: 日時の順に追加するので，dict の挿入順がそのまま時系列の順になる
     _num_period (int) : period の個数
     _max_period (int) : 長さが最大の period (1オリジン)
+
+    _web_drivers (list) : ログイン済みの WebDriver (キーワード間で使い回す)
+    _driver_stack (ExitStack) : _web_drivers を終了させるための ExitStack
     '''
     def __init__(self):
 
         self._keyword = ""
         self._keyword_id = ""
+        self._keyword_id_cache_path = ""
 
         self._start_date = ""
         self._end_date = ""
 
         self._save_dir = ""
 
+        self._url_prefix = ""
+        self._save_prefix = ""
+
         self._data = dict()
 
         self._num_period = 0
         self._max_period = 0
 
-    def shift_date(self, date: str, shift: int):
-        '''
-        基準日から shift だけずらした日付を得る
-
-        Parameters
-        -----------
-        date (str): 基準日 (Format: YYYY-MM-DD)
-        shift (int): shift する日数 (shift >= 0)
-
-        Returns
-        -----------
-        str : shift だけずらした日付の文字列 (Format: YYYY-MM-DD)
-        '''
-        assert shift >= 0
-
-        dt = datetime.strptime(date, '%Y-%m-%d')
-        shifted_dt = dt + timedelta(days=shift)  # shift だけずらした日付を得る
-        shifted_date = shifted_dt.strftime('%Y-%m-%d')
-
-        return shifted_date
+        self._web_drivers = []
+        self._driver_stack = ExitStack()
 
     def make_save_dir(self):
         '''
@@ -124,7 +215,8 @@ class SocialInsightData():
                                 start_date: str,
                                 end_date: str,
                                 keyword: str,
-                                save_dir: str = ""):
+                                save_dir: str = "",
+                                n_workers: int = 1):
         '''
         start_date から end_date までの検索キーワード keyword の時系列データを取得
 
@@ -136,39 +228,138 @@ class SocialInsightData():
         
         save_dir (str) : ダウンロードした csv ファイルの保存ディレクトリ (Default: "")
              ※ "" であるときは，SI_keyword/csv に保存
+        n_workers (int) : 並列にデータを取得する WebDriver の個数 (Default: 1)
         '''
 
         self._start_date = start_date
         self._end_date = end_date
         self._keyword = keyword
+        self._keyword_id_cache_path = f".si_keyword_id_{self._keyword}"
 
         if save_dir != "":
             self._save_dir = save_dir
         else:
             self._save_dir = f"SI_{self._keyword}/csv"
+        self._save_prefix = f"{self._save_dir}/data_"
 
         self.make_save_dir()
 
-        self._num_period = 0  # 重複したデータの区間数
+        # スケーリングしないので，period 0 だけを最初に用意しておく
+        self._data = {0: dict()}
+        self._num_period = 1  # 重複したデータの区間数
         self._max_period = 0  # 最大長の period 番号
 
-        # start_date から end_date までの区間を分割してデータを取得
-        web_driver = self.open_web_driver('chrome')
-        self.login_Social_Insight(web_driver)
+        # start_date から end_date までの区間を 1 日ごとに分割してデータを取得
+        dates = []
+        day = Date.fromisoformat(self._start_date)
+        end_day = Date.fromisoformat(self._end_date)
+        while day < end_day:
+            dates.append(day.isoformat())
+            day += timedelta(days=1)
+
+        # 1 ヶ月分をまとめたファイルがある月は，日ごとの csv を見ない
+        cached_months = {
+            month
+            for month in {date[:7]
+                          for date in dates}
+            if os.path.exists(self.save_month_file(month))
+        }
+
+        # 保存済みの日付は取得しない (全て保存済みならブラウザを開かない)
+        pending = []
+        for date in dates:
+            if date[:7] in cached_months:
+                continue
+            save_file = self.save_csv_file(date)
+            if os.path.exists(save_file):
+                print(f"NOTICE: the data {save_file} already exists",
+                      file=sys.stderr)
+            else:
+                pending.append(date)
 
-        self._keyword_id = self.get_keyword_id(web_driver)
+        if pending:
+            self.run_parallel(pending, min(n_workers, len(pending)))
 
-        date = self._start_date
-        while date < self._end_date:
-            if os.path.exists(self.save_csv_file(date)):
-                print(
-                    f"NOTICE: the data {self.save_csv_file(date)} already exists",
-                    file=sys.stderr)
-            else:
+        # ダウンロードしたデータを月ごとに _data に追加
+        for month, month_dates in groupby(dates, key=lambda date: date[:7]):
+            if month in cached_months:
+                self.add_data_from_month_file(month)
+                continue
+
+            month_dates = list(month_dates)
+            month_data = dict()
+            for date in month_dates:
+                self.add_data_from_csv(date, month_data)
+            self._data[0].update(month_data)
+
+            # 1 ヶ月分が揃ったら，次回からは 1 つのファイルで読み込めるようにする
+            next_day = Date.fromisoformat(month_dates[-1]) + timedelta(days=1)
+            if month_dates[0].endswith("-01") and next_day.day == 1:
+                self.save_data_to_month_file(month, month_data)
+
+    def run_parallel(self, dates: list[str], n_workers: int = 4):
+        '''
+        日付 dates のデータを n_workers 個の WebDriver で並列に取得
+
+        Parameters
+        -----------
+        dates (list[str]) : データを取得する日付のリスト (Format: YYYY-MM-DD)
+        n_workers (int) : 並列に動かす WebDriver の個数 (Default: 4)
+
+        NOTE: 各 WebDriver は 1 度だけログインし，キューから貸し出して使い回す
+              _data への追加は呼び出し側で日付順に行う
+        '''
+        web_drivers = self.open_web_drivers(n_workers)
+
+        self._keyword_id = self.get_keyword_id(web_drivers[0])
+        self._url_prefix = f"https://social-admin.userlocal.jp/keywords/{self._keyword_id}/tw/summary?end_date="
+
+        driver_queue = queue.Queue()
+        for web_driver in web_drivers:
+            driver_queue.put(web_driver)
+
+        def download(date: str):
+            web_driver = driver_queue.get()
+            try:
                 self.get_Social_Insight_data_at_date(date,
                                                      web_driver)  # 1 日分のデータを取得
-            self.add_data_from_csv(date)  # ダウンロードしたデータを _data に追加
-            date = self.shift_date(date, 1)
+            finally:
+                driver_queue.put(web_driver)
+
+        with ThreadPoolExecutor(max_workers=n_workers) as executor:
+            list(executor.map(download, dates))
+
+    def open_web_drivers(self, n_workers: int):
+        '''
+        ログイン済みの WebDriver を n_workers 個用意する
+
+        Parameters
+        -----------
+        n_workers (int) : 用意する WebDriver の個数
+
+        Returns
+        -----------
+        list : ログイン済みの WebDriver のリスト
+            NOTE: 既に開いている WebDriver は使い回し，足りない分だけ開く
+                  close_web_drivers を呼ぶまで開いたままになる
+        '''
+        assert n_workers >= 1
+
+        for i in range(len(self._web_drivers), n_workers):
+            # NOTE: 同じプロファイルは複数の Chrome で同時に使えない
+            web_driver = self._driver_stack.enter_context(
+                self.driver_session('chrome', f"{CHROME_PROFILE_DIR}_{i}"))
+            self.login_Social_Insight(web_driver)
+            self._web_drivers.append(web_driver)
+
+        return self._web_drivers[:n_workers]
+
+    def close_web_drivers(self):
+        '''
+        open_web_drivers で開いた全ての WebDriver を終了する
+        '''
+        self._driver_stack.close()
+        self._web_drivers = []
 
     def auth_Social_Insight(self) -> (str, str):
 
@@ -176,7 +367,7 @@ class SocialInsightData():
         SI_id_file = '.si_id'
         if os.path.exists(SI_id_file):
             with open(SI_id_file, 'r') as f:
-                auth_id = f.readline()
+                auth_id = f.read().strip()
         else:
             print('Please input Social Insight id (e.g., example@email.com)',
                   file=sys.stderr)
@@ -186,49 +377,145 @@ class SocialInsightData():
                 f.write(auth_id)
 
         # input KG pass
+        # NOTE: keyring モジュールがあれば OS の keyring に保存し，
+        #       なければ本人だけが読めるファイル .si_pass に保存する
+        #   NOTE: .si_pass があるときは，keyring よりも優先する
+        #         (パスワードを変えたときは，新しいパスワードを .si_pass に書けばよい)
         SI_pass_file = '.si_pass'
+        auth_pass = None
         if os.path.exists(SI_pass_file):
             with open(SI_pass_file, 'r') as f:
-                auth_pass = f.readline()
-        else:
+                # NOTE: パスワードの前後の空白は，パスワードの一部として残す
+                auth_pass = f.read().rstrip("\r\n")
+            # 平文のファイルは keyring に移す (使えなければパーミッションを 600 にする)
+            self.save_password(SI_pass_file, auth_id, auth_pass)
+        elif keyring is not None:
+            try:
+                auth_pass = keyring.get_password(KEYRING_SERVICE, auth_id)
+            except KeyringError:
+                pass
+
+        if auth_pass is None:
             print('Please input Socal Insight password', file=sys.stderr)
             print("password: ", end="", file=sys.stderr)
             auth_pass = getpass.getpass()
-            with open(SI_pass_file, 'w') as f:
-                f.write(auth_pass)
+            self.save_password(SI_pass_file, auth_id, auth_pass)
 
         return (auth_id, auth_pass)
 
+    def save_password(self, SI_pass_file: str, auth_id: str, auth_pass: str):
+        '''
+        パスワードを keyring (なければファイル SI_pass_file) に保存する
+            NOTE: keyring に保存できたときは，平文のファイル SI_pass_file を削除する
+
+        Parameters
+        -----------
+        SI_pass_file (str) : keyring が使えないときにパスワードを保存するファイル
+        auth_id (str) : Social Insight の id
+        auth_pass (str) : Social Insight のパスワード
+        '''
+        if keyring is not None:
+            try:
+                keyring.set_password(KEYRING_SERVICE, auth_id, auth_pass)
+                if os.path.exists(SI_pass_file):
+                    os.remove(SI_pass_file)
+                    print(f"NOTICE: move the password in {SI_pass_file}",
+                          "to keyring",
+                          file=sys.stderr)
+                return
+            except KeyringError:
+                print("NOTICE: keyring is not available,",
+                      f"save the password to {SI_pass_file}",
+                      file=sys.stderr)
+
+        # 他のユーザから読めないように，パーミッションを 600 にする
+        with open(SI_pass_file,
+                  'w',
+                  opener=lambda path, flags: os.open(path, flags, 0o600)) as f:
+            f.write(auth_pass)
+        os.chmod(SI_pass_file, 0o600)
+
     def login_Social_Insight(self, web_driver):
 
+        # プロファイルにログイン状態が残っていれば，ログインページに飛ばされない
+        web_driver.get("https://social-admin.userlocal.jp/keywords")
+        if "auth.userlocal.jp" not in web_driver.current_url:
+            print("NOTICE: already logged in to Social Insight",
+                  file=sys.stderr)
+            return
+
         auth_id, auth_pass = self.auth_Social_Insight()
 
         web_driver.get("https://auth.userlocal.jp/login?")
-        print(auth_id, auth_pass)
         web_driver.find_element(By.NAME, "email").send_keys(auth_id)
         web_driver.find_element(By.NAME, "password").send_keys(auth_pass)
-        WebDriverWait(web_driver, 10).until(
+        current_url = web_driver.current_url
+        WebDriverWait(web_driver, TIMEOUT_OF_VIEW).until(
             EC.element_to_be_clickable(
                 (By.XPATH, "//input[@value='ログイン']"))).click()
 
-        time.sleep(WAIT_TIME_OF_VIEW)
+        # ログイン後のページに遷移するまで待つ
+        WebDriverWait(web_driver,
+                      TIMEOUT_OF_VIEW).until(EC.url_changes(current_url))
 
-    def add_data_from_csv(self, date: str):
+    def add_data_from_csv(self, date: str, period: dict | None = None):
+        '''
+        日付 date の csv ファイルを読み込み，時系列データを period に格納
 
-        if not self._data:
-            self._data[0] = dict()
-            self._num_period = 1
+        Parameters
+        -----------
+        date (str) : 読み込むデータの日付 (Format: YYYY-MM-DD)
+        period (dict) : 格納先の時系列データ (Default: None)
+             ※ None であるときは，_data[0] に格納
+        '''
+        if period is None:
+            period = self._data[0]
 
         # ダウンロードした csv ファイルの読み込みと，_data への格納
-        with open(self.save_csv_file(date), "r") as f:
-            for line in f.readlines():
-                sline = line.strip()
+        with open(self.save_csv_file(date), "r", buffering=1 << 20) as f:
+            for line in f:
                 # ASSERTION: 時系列データの先頭は "20" であること
-                if sline[0:2] != "20":
-                    continue
-                t, data = sline.split(",")  # t の書式: YYYY-MM-DDTHH
+                m = ROW_PATTERN.match(line)
+                if m:
+                    period[m.group(1)] = m.group(2).rstrip()
+
+    def add_data_from_month_file(self, month: str):
+        '''
+        月 month の時系列データをまとめたファイルを読み込み，_data に格納
 
-                self._data[0][t] = data
+        Parameters
+        -----------
+        month (str) : 読み込むデータの月 (Format: YYYY-MM)
+            NOTE: start_date から end_date までの期間に含まれる日時だけを格納する
+        '''
+        period = self._data[0]
+        with open(self.save_month_file(month), "r", buffering=1 << 20) as f:
+            for line in f:
+                row = json.loads(line)
+                t = row["t"]  # t の書式: YYYY-MM-DDTHH
+                if self._start_date <= t[:10] < self._end_date:
+                    period[t] = row["data"]
+
+    def save_data_to_month_file(self, month: str, month_data: dict):
+        '''
+        月 month の時系列データを 1 つのファイル (JSON Lines) にまとめて保存
+
+        Parameters
+        -----------
+        month (str) : 保存するデータの月 (Format: YYYY-MM)
+        month_data (dict) : 月 month の時系列データ
+        '''
+        save_file = self.save_month_file(month)
+        body = "".join(
+            json.dumps({
+                "t": t,
+                "data": data
+            }, ensure_ascii=False) + "\n" for t, data in month_data.items())
+        with open(save_file, 'w', buffering=1 << 16) as f:
+            f.write(body)
+
+        print(f"NOTICE: save the data of {month} to {save_file}",
+              file=sys.stderr)
 
     def get_Social_Insight_data_at_date(self, date: str, web_driver):
         '''
@@ -237,6 +524,10 @@ class SocialInsightData():
         Parameters
         -----------
         date (str) : 基準日 (Format: YYYY-MM-DD)
+
+        NOTE: csv はブラウザ上で Highcharts の getCSV() が生成するため，
+              HTTP で HTML を取得するだけでは得られない
+              (複数日の取得を速くしたいときは run_parallel を使う)
         '''
 
         # assert self._web_driver is not None
@@ -251,70 +542,83 @@ class SocialInsightData():
 
         # データの取得
         web_driver.get(self.social_insight_url(date))
-        time.sleep(WAIT_TIME_OF_VIEW)
-
-        for i in range(
-                web_driver.execute_script("return Highcharts.charts.length;")):
-
-            csv = web_driver.execute_script(
-                f"return Highcharts.charts[{i}]?.getCSV?.();")
-            if not csv:
-                continue
-
-            if "時間帯別" in csv:
-                csv_list = csv.splitlines()[1:]
-                with open(self.save_csv_file(date), 'w') as f:
-                    for line in csv_list:
-                        tok = line.split(',')
-                        print(line, end="")
-                        t = int(tok[0])
-                        data = tok[1]
-                        f.write(f"{date}T{t:02},{data}\n")
-                print(
-                    f"NOTICE: success donwnload csv file {self.save_csv_file(date)}",
-                    f"at {datetime.now()}",
-                    file=sys.stderr)
-
-                return
-
-        else:
+        # 時間帯別のグラフができるまで待ち，その csv を 1 回の呼び出しで得る
+        try:
+            csv_text = wait_for_highcharts(web_driver, "時間帯別")
+        except TimeoutException:
             print(f"ERROR: does not download csv file at {datetime.now()}",
                   file=sys.stderr)
+            return
+
+        csv_list = csv_text.splitlines()[1:]
+        # 1 時間ごとの行をまとめてから 1 回で書き込む
+        body = "".join(f"{date}T{int(tok[0]):02},{tok[1]}\n"
+                       for tok in (line.split(',') for line in csv_list))
+        save_file = self.save_csv_file(date)
+        with open(save_file, 'w', buffering=1 << 16) as f:
+            f.write(body)
+        print(f"NOTICE: success donwnload csv file {save_file}",
+              f"at {datetime.now()}",
+              file=sys.stderr)
 
     def get_keyword_id(self, web_driver):
 
+        # 一度取得したキーワードの ID はファイルに保存しておく
+        if os.path.exists(self._keyword_id_cache_path):
+            with open(self._keyword_id_cache_path, 'r') as f:
+                return f.read().strip()
+
         web_driver.get("https://social-admin.userlocal.jp/keywords")
-        WebDriverWait(web_driver, 10).until(
+        WebDriverWait(web_driver, TIMEOUT_OF_VIEW).until(
             EC.presence_of_all_elements_located((By.TAG_NAME, "a")))
-        links = web_driver.find_elements(By.TAG_NAME, "a")
-        for link in links:
-            if link.text.strip() == self._keyword:
-                href = link.get_attribute("href")
-                if "/keywords/" in href:
-                    keyword_id = href.split("/keywords/")[1].split("/")[0]
-                    time.sleep(WAIT_TIME_OF_VIEW)
-
-                    return keyword_id
-        else:
+
+        # キーワードのリンクをブラウザ側で XPath で絞り込む
+        try:
+            link = web_driver.find_element(
+                By.XPATH, "//a[contains(@href, '/keywords/')"
+                f" and normalize-space(.) = {xpath_literal(self._keyword)}]")
+        except NoSuchElementException:
             print(
                 f"ERROR: does not find keyword id of {self._keyword} at {datetime.now()}",
                 file=sys.stderr)
+            return
+
+        href = link.get_attribute("href")
+
+        keyword_id = href.split("/keywords/")[1].split("/")[0]
+        with open(self._keyword_id_cache_path, 'w') as f:
+            f.write(keyword_id)
+
+        return keyword_id
 
     def social_insight_url(self, date: str):
-        assert self._keyword_id != ""
+        assert self._url_prefix != ""
 
-        url = f"https://social-admin.userlocal.jp/keywords/{self._keyword_id}/tw/summary?end_date={date}&start_date={date}"
+        url = self._url_prefix + date + "&start_date=" + date
 
         return url
 
     def save_csv_file(self, date: str):
-        save_file = f"{self._save_dir}/data_{date}.csv"
+        save_file = self._save_prefix + date + ".csv"
+
+        return save_file
+
+    def save_month_file(self, month: str):
+        save_file = self._save_prefix + month + ".jsonl"
 
         return save_file
 
-    def open_web_driver(self, kind_driver: str = "chrome"):
+    def open_web_driver(self,
+                        kind_driver: str = "chrome",
+                        profile_dir: str = CHROME_PROFILE_DIR):
         '''
         データ取得の初期化
+
+        Parameters
+        -----------
+        kind_driver (str) : 使用するブラウザ ("chrome" or "safari")
+        profile_dir (str) : Chrome のプロファイルディレクトリ (Default: CHROME_PROFILE_DIR)
+             ※ ログイン状態を次回の実行に引き継ぐために使う
         '''
         assert kind_driver in {"chrome", "safari"}
 
@@ -323,6 +627,20 @@ class SocialInsightData():
             service = Service("driver/chromedriver")
             options = webdriver.ChromeOptions()
             options.add_argument('--headless')  # ウィンドウを開かないようにする
+            options.add_argument(
+                f'--user-data-dir={os.path.abspath(profile_dir)}')
+
+            # 画像などの使わないリソースは読み込まない
+            prefs = {
+                "profile.managed_default_content_settings.images": 2,
+                "profile.default_content_setting_values.cookies": 1
+            }
+            options.add_experimental_option("prefs", prefs)
+            options.add_argument('--blink-settings=imagesEnabled=false')
+            options.add_argument('--disable-gpu')
+            options.add_argument('--disable-extensions')
+            # DOMContentLoaded で get() から戻る (グラフは wait_for_highcharts で待つ)
+            options.page_load_strategy = 'eager'
 
             web_driver = webdriver.Chrome(service=service, options=options)
         elif kind_driver == "safari":
@@ -340,16 +658,39 @@ class SocialInsightData():
         assert web_driver is not None
         web_driver.quit()
 
+    @contextmanager
+    def driver_session(self,
+                       kind_driver: str = "chrome",
+                       profile_dir: str = CHROME_PROFILE_DIR):
+        '''
+        WebDriver を開き，with を抜けるときに必ず終了する
+
+        Parameters
+        -----------
+        kind_driver (str) : 使用するブラウザ ("chrome" or "safari")
+        profile_dir (str) : Chrome のプロファイルディレクトリ (Default: CHROME_PROFILE_DIR)
+
+        NOTE: 例外やシグナルで終了しても，ブラウザのプロセスが残らないようにする
+        '''
+        web_driver = self.open_web_driver(kind_driver, profile_dir)
+        atexit.register(web_driver.quit)
+        try:
+            yield web_driver
+        finally:
+            atexit.unregister(web_driver.quit)
+            self.close_web_driver(web_driver)
+
     def print_data(self):
 
-        for p, data_dict in sorted(self._data.items(), key=lambda x: x[0]):
-            for t, data in sorted(data_dict.items(), key=lambda x: x[0]):
+        # NOTE: _data は日時の順に追加しているので並べ替えない
+        for p, data_dict in self._data.items():
+            for t, data in data_dict.items():
                 print(f"ALL_DATA: period {p} t {t} data {data}")
 
     def print_data_of_max_period(self):
 
         p = self._max_period
-        for t, data in sorted(self._data[p].items(), key=lambda x: x[0]):
+        for t, data in self._data[p].items():
             print(f"DATA: period {p} t {t} data {data}")
 
 
@@ -357,12 +698,25 @@ if __name__ == '__main__':
 
     args = parse_args()
 
-    keyword = args.keyword  # 検索キーワード
+    keywords = args.keywords  # 検索キーワードのリスト
     start_date = args.start_date  # データ取得期間の開始日
     end_date = args.end_date  # データ取得期間の終了日
     save_dir = args.save  # ダウンロードした csv ファイルの保存ディレクトリ
+    n_workers = args.num_workers  # 並列にデータを取得する WebDriver の個数
+
+    # Ctrl-C や kill でも WebDriver を終了させてから抜ける
+    signal.signal(signal.SIGINT, exit_on_signal)
+    signal.signal(signal.SIGTERM, exit_on_signal)
 
+    # 全てのキーワードで同じ WebDriver を使い回す
     getter = SocialInsightData()
-    getter.get_Social_Insight_data(start_date, end_date, keyword, save_dir)
-    getter.print_data()  # 全ての period のデータを出力
-    getter.print_data_of_max_period()  # 最大の period のデータを出力
+    try:
+        for keyword in keywords:
+            getter.get_Social_Insight_data(start_date, end_date, keyword,
+                                           save_dir, n_workers)
+            if len(keywords) > 1:
+                print(f"KEYWORD: {keyword}")
+            getter.print_data()  # 全ての period のデータを出力
+            getter.print_data_of_max_period()  # 最大の period のデータを出力
+    finally:
+        getter.close_web_drivers()